@@ -0,0 +1,134 @@
+import os
+import sys
+import json
+import time
+import argparse
+
+from season_paths import DRIVER_STANDINGS_FILENAME, SEASON_RACES_DIR, load_season_list, season_dir, \
+    season_info_path, race_result_path
+
+# Only the standard library and season_paths are imported at module level. pandas, numpy, dataclass_wizard and the
+# discord/tabulate packages are imported inside the subcommands that need them so cheap invocations stay cheap.
+
+
+def _selected_seasons(args):
+    return args.season if args.season else load_season_list()
+
+
+def parse(args):
+    from parse_results import load_season
+    for season in _selected_seasons(args):
+        s = load_season(season)
+        s.generate_standings(season_dir(season))
+        s.generate_race_results(season_dir(season))
+        s.generate_head_to_head(season_dir(season))
+
+
+def standings(args):
+    from parse_results import load_season
+    for season in _selected_seasons(args):
+        load_season(season).generate_standings(season_dir(season))
+
+
+def results(args):
+    from parse_results import load_season
+    for season in _selected_seasons(args):
+        load_season(season).generate_race_results(season_dir(season))
+
+
+def head_to_head(args):
+    from parse_results import load_season
+    for season in _selected_seasons(args):
+        load_season(season).generate_head_to_head(season_dir(season))
+
+
+def push(args):
+    from discord_push import push_driver_standings
+    season = args.season
+    if season is None:
+        season_list = load_season_list()
+        if not season_list:
+            return
+        season = season_list[-1]
+    push_driver_standings(os.path.join(season_dir(season), DRIVER_STANDINGS_FILENAME))
+
+
+def stats(args):
+    for season in _selected_seasons(args):
+        with open(season_info_path(season), 'r', encoding='utf-8') as f:
+            info = json.load(f)
+        races = info.get("races", [])
+        result_files = [race.get("result_file") or race.get("resultFile") for race in races]
+        num_results = sum(1 for result_file in result_files
+                          if result_file and os.path.isfile(race_result_path(season, result_file)))
+        print(f"{season}: {info.get('name', season)} - {num_results}/{len(races)} rounds with results")
+
+        standings_path = os.path.join(season_dir(season), DRIVER_STANDINGS_FILENAME)
+        if not os.path.isfile(standings_path):
+            continue
+        with open(standings_path, 'r', encoding='utf-8') as f:
+            rows = json.load(f)["standings"]
+        if rows:
+            print(f"  leader: {rows[0]['name']} ({rows[0]['team']}) {rows[0]['championshipPoints']} pts")
+
+
+def _season_input_mtimes(season):
+    paths = [season_info_path(season)]
+    races_dir = os.path.join(season_dir(season), SEASON_RACES_DIR)
+    if os.path.isdir(races_dir):
+        paths += [os.path.join(races_dir, name) for name in os.listdir(races_dir) if name.endswith(".json")]
+    return {path: os.path.getmtime(path) for path in paths if os.path.isfile(path)}
+
+
+def watch(args):
+    last_seen = dict()
+    while True:
+        for season in _selected_seasons(args):
+            mtimes = _season_input_mtimes(season)
+            if mtimes == last_seen.get(season):
+                continue
+            print(f"Regenerating {season}", flush=True)
+            try:
+                parse(argparse.Namespace(season=[season]))
+            except Exception as e:
+                # e.g. a result file that is still being uploaded; it will be retried on the next check
+                print(f"Failed to regenerate {season}: {e!r}", file=sys.stderr, flush=True)
+                continue
+            last_seen[season] = mtimes
+        time.sleep(args.interval)
+
+
+def create_parser():
+    parser = argparse.ArgumentParser(prog="ctc", description="CTC dashboard data tools")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    season_help = "season directory to process (repeatable, defaults to all seasons)"
+
+    for name, func, help_text in (
+            ("parse", parse, "generate standings, race results and head-to-head matrices"),
+            ("standings", standings, "generate driver and team standings"),
+            ("results", results, "generate per-round race results"),
+            ("head-to-head", head_to_head, "generate driver head-to-head matrices"),
+            ("stats", stats, "print a summary of each season"),
+    ):
+        subparser = subparsers.add_parser(name, help=help_text)
+        subparser.add_argument("--season", action="append", help=season_help)
+        subparser.set_defaults(func=func)
+
+    push_parser = subparsers.add_parser("push", help="push driver standings to Discord")
+    push_parser.add_argument("--season", help="season directory to push (defaults to the latest season)")
+    push_parser.set_defaults(func=push)
+
+    watch_parser = subparsers.add_parser("watch", help="regenerate seasons whenever their result files change")
+    watch_parser.add_argument("--season", action="append", help=season_help)
+    watch_parser.add_argument("--interval", type=float, default=5.0, help="seconds between checks")
+    watch_parser.set_defaults(func=watch)
+    return parser
+
+
+def main(argv=None):
+    args = create_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
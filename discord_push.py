@@ -6,8 +6,8 @@ import json
 
 MAX_POST_LEN = 1990
 
-def main():
-    driver_standings = json.load(open('./data/seasons/season2/driver_standings.json', 'r', encoding='utf-8'))
+def push_driver_standings(driver_standings_path):
+    driver_standings = json.load(open(driver_standings_path, 'r', encoding='utf-8'))
     trimmed_standings = list()
     for (pos, row) in enumerate(driver_standings["standings"], 1):
         row_dict = dict()
@@ -72,6 +72,3 @@ def main():
     matrix_dict = {"include": message_list}
     with open(os.environ['GITHUB_OUTPUT'], 'a') as f:
         f.write(f"matrix={json.dumps(matrix_dict)}")
-
-if __name__ == "__main__":
-    main()
@@ -81,4 +81,20 @@ class ModelStandingsRow(JSONWizard, JSONFileWizard, key_case='AUTO'):
 
 @dataclass
 class ModelStandings(JSONWizard, JSONFileWizard, key_case='AUTO'):
-    standings: list[ModelStandingsRow] = field(default_factory=list)
\ No newline at end of file
+    standings: list[ModelStandingsRow] = field(default_factory=list)
+
+@dataclass
+class HeadToHead(JSONWizard, JSONFileWizard, key_case='AUTO'):
+    # Each matrix is indexed [row][column] by position in drivers and compares the row driver against the column
+    # driver over the rounds both started. Only drivers who started at least one round are included. Averages are
+    # row minus column, so a positive average_finish_gap means the row driver finished behind and a positive
+    # average_best_lap_delta (in ms) means the row driver was slower. Averages are None when the pair has no round
+    # to compare. The diagonal (a driver against themselves) is zero in the count matrices and None in the averages.
+    drivers: list[str] = field(default_factory=list)
+    teams: list[str] = field(default_factory=list)
+    shared_rounds: list[list[int]] = field(default_factory=list)
+    teammate_rounds: list[list[int]] = field(default_factory=list)
+    qualifying_wins: list[list[int]] = field(default_factory=list)
+    race_wins: list[list[int]] = field(default_factory=list)
+    average_finish_gap: list[list[float | None]] = field(default_factory=list)
+    average_best_lap_delta: list[list[int | None]] = field(default_factory=list)
@@ -0,0 +1,94 @@
+import numpy as np
+
+from generated_data import HeadToHead
+from server_result_data import NO_VALID_LAP_TIME
+
+
+def calculate_head_to_head(season) -> HeadToHead:
+    """
+    Compares every pair of drivers in a season over the rounds they both started.
+
+    Per-round values are gathered into (drivers x rounds) arrays and each pairwise statistic is computed by
+    broadcasting them against themselves into (drivers x drivers x rounds) arrays, so the whole grid is compared
+    in a single numpy expression rather than pair by pair. Missing values are NaN, which never win a comparison
+    and are excluded from the averages.
+    """
+    identities = season.identities
+    driver_ids = sorted({identities.canonical_driver(entrant.driver.driver_id)
+                         for entrant in season.entrants.values()})
+    row_of = {driver_id: row for row, driver_id in enumerate(driver_ids)}
+    num_drivers = len(driver_ids)
+    num_rounds = len(season.race_results)
+
+    qualifying = np.full((num_drivers, num_rounds), np.nan)
+    race_order = np.full((num_drivers, num_rounds), np.nan)
+    finish = np.full((num_drivers, num_rounds), np.nan)
+    best_lap = np.full((num_drivers, num_rounds), np.nan)
+    team = np.full((num_drivers, num_rounds), -1, dtype=np.int64)
+    team_names = [""] * num_drivers
+    for entrant in season.entrants.values():
+        team_names[row_of[identities.canonical_driver(entrant.driver.driver_id)]] = entrant.team.team_name
+
+    for race_idx, race in enumerate(season.race_results):
+        for car_id, entrant in race.entrants.items():
+            position = race.position_by_car.get(car_id)
+            if position is None:
+                continue  # did not start
+            row = row_of[identities.canonical_driver(entrant.driver.driver_id)]
+            race_order[row, race_idx] = position
+            team[row, race_idx] = entrant.team.team_id
+            team_names[row] = entrant.team.team_name  # use most recent team name
+            if entrant.qualify_positions[race_idx] > 0:
+                qualifying[row, race_idx] = entrant.qualify_positions[race_idx]
+            if entrant.finish_positions[race_idx] > 0:
+                finish[row, race_idx] = entrant.finish_positions[race_idx]
+            if race.laps_by_car[car_id] > 0 and race.best_lap_by_car[car_id] < NO_VALID_LAP_TIME:
+                best_lap[row, race_idx] = race.best_lap_by_car[car_id]
+
+    # Keep the matrices compact by dropping drivers who entered but never started a round
+    started = ~np.isnan(race_order)
+    keep = started.any(axis=1)
+    driver_ids = [driver_id for driver_id, kept in zip(driver_ids, keep) if kept]
+    team_names = [team_name for team_name, kept in zip(team_names, keep) if kept]
+    started, qualifying, race_order, finish, best_lap, team = (
+        values[keep] for values in (started, qualifying, race_order, finish, best_lap, team))
+
+    both_started = started[:, None, :] & started[None, :, :]
+    teammates = both_started & (team[:, None, :] == team[None, :, :])
+    shared_rounds = both_started.sum(axis=2)
+    teammate_rounds = teammates.sum(axis=2)
+    np.fill_diagonal(shared_rounds, 0)
+    np.fill_diagonal(teammate_rounds, 0)
+
+    return HeadToHead(
+        drivers=[identities.driver_name(driver_id) for driver_id in driver_ids],
+        teams=team_names,
+        shared_rounds=shared_rounds.tolist(),
+        teammate_rounds=teammate_rounds.tolist(),
+        qualifying_wins=_pairwise_wins(qualifying).tolist(),
+        race_wins=_pairwise_wins(race_order).tolist(),
+        average_finish_gap=_to_json_matrix(np.round(_pairwise_mean_difference(finish), 2)),
+        average_best_lap_delta=_to_json_matrix(np.rint(_pairwise_mean_difference(best_lap)), as_int=True),
+    )
+
+
+def _pairwise_wins(positions: np.ndarray) -> np.ndarray:
+    # NaN compares False, so rounds either driver has no position for are not counted
+    return (positions[:, None, :] < positions[None, :, :]).sum(axis=2)
+
+
+def _pairwise_mean_difference(values: np.ndarray) -> np.ndarray:
+    differences = values[:, None, :] - values[None, :, :]
+    valid = ~np.isnan(differences)
+    counts = valid.sum(axis=2)
+    totals = np.where(valid, differences, 0.0).sum(axis=2)
+    means = np.divide(totals, counts, out=np.full(counts.shape, np.nan), where=counts > 0)
+    np.fill_diagonal(means, np.nan)
+    return means
+
+
+def _to_json_matrix(values: np.ndarray, as_int: bool = False) -> list[list[float | int | None]]:
+    missing = np.isnan(values)
+    matrix = (np.where(missing, 0, values).astype(np.int64) if as_int else values).astype(object)
+    matrix[missing] = None
+    return matrix.tolist()
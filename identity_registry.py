@@ -0,0 +1,122 @@
+class InternTable(object):
+    """Maps strings onto dense integer ids, allocated in first-seen order."""
+
+    def __init__(self):
+        self._ids: dict[str, int] = dict()
+        self._values: list[str] = list()
+
+    def __len__(self):
+        return len(self._values)
+
+    def intern(self, value: str) -> int:
+        value_id = self._ids.get(value)
+        if value_id is None:
+            value_id = len(self._values)
+            self._ids[value] = value_id
+            self._values.append(value)
+        return value_id
+
+    def value_of(self, value_id: int) -> str:
+        return self._values[value_id]
+
+
+class IdentityRegistry(object):
+    """
+    Interns the identifying strings of a season's entries (GUIDs, names, teams and car models) to dense
+    integer ids and resolves drivers by GUID rather than by name.
+
+    Every GUID in a driver's GuidsList is aliased to the same driver id, so a renamed driver (or one reporting a
+    new GUID alongside an old one) keeps a single identity. If a GuidsList links two drivers that were previously
+    seen separately, the later one is aliased onto the earlier one and its entrants are re-keyed onto the merged
+    driver. Where that leaves two entrants for the same (driver, model, team) the pair is queued in
+    pending_entrant_merges for the owner of the per-entrant data to combine. Cars without a GUID are keyed by name.
+    """
+
+    def __init__(self):
+        self.guids = InternTable()
+        self.names = InternTable()
+        self.teams = InternTable()
+        self.models = InternTable()
+        self._driver_by_guid: list[int] = list()
+        self._driver_parent: list[int] = list()
+        self._driver_name: list[int] = list()
+        self._guidless_driver_by_name: dict[int, int] = dict()
+        self._entrant_ids: dict[tuple[int, int, int], int] = dict()
+        self._entrant_keys: list[tuple[int, int, int]] = list()
+        # (merged entrant id, surviving entrant id) pairs not yet applied by the owner of the entrant data
+        self.pending_entrant_merges: list[tuple[int, int]] = list()
+
+    def canonical_driver(self, driver_id: int) -> int:
+        parent = self._driver_parent
+        while parent[driver_id] != driver_id:
+            parent[driver_id] = parent[parent[driver_id]]
+            driver_id = parent[driver_id]
+        return driver_id
+
+    def resolve_driver(self, guid: str, guids_list: list[str], name: str) -> int:
+        guids = [g for g in (guid, *guids_list) if g]
+        if not guids:
+            return self._resolve_guidless_driver(name)
+
+        num_known_guids = len(self._driver_by_guid)
+        known_ids = {self.canonical_driver(self._driver_by_guid[guid_id])
+                     for guid_id in map(self.guids.intern, guids) if guid_id < num_known_guids}
+        if known_ids:
+            # Driver ids are allocated in first-seen order, so the lowest is the earliest seen identity
+            driver_id = min(known_ids)
+            for known_id in sorted(known_ids - {driver_id}):
+                self._merge_drivers(known_id, driver_id)
+        else:
+            driver_id = self._new_driver()
+        # Any GUIDs interned by this call are new aliases of this driver
+        self._driver_by_guid.extend([driver_id] * (len(self.guids) - num_known_guids))
+        self._driver_name[driver_id] = self.names.intern(name)
+        return driver_id
+
+    def _resolve_guidless_driver(self, name: str) -> int:
+        name_id = self.names.intern(name)
+        driver_id = self._guidless_driver_by_name.get(name_id)
+        if driver_id is None:
+            driver_id = self._new_driver()
+            self._guidless_driver_by_name[name_id] = driver_id
+            self._driver_name[driver_id] = name_id
+        return self.canonical_driver(driver_id)
+
+    def _new_driver(self) -> int:
+        driver_id = len(self._driver_parent)
+        self._driver_parent.append(driver_id)
+        self._driver_name.append(-1)
+        return driver_id
+
+    def _merge_drivers(self, merged_id: int, driver_id: int):
+        self._driver_parent[merged_id] = driver_id
+        for entrant_id, (entrant_driver_id, model_id, team_id) in enumerate(self._entrant_keys):
+            if entrant_driver_id != merged_id:
+                continue
+            old_key = self._entrant_keys[entrant_id]
+            new_key = (driver_id, model_id, team_id)
+            if self._entrant_ids.get(old_key) != entrant_id:
+                continue  # already merged into another entrant
+            del self._entrant_ids[old_key]
+            surviving_id = self._entrant_ids.get(new_key)
+            if surviving_id is None:
+                self._entrant_ids[new_key] = entrant_id
+                self._entrant_keys[entrant_id] = new_key
+            else:
+                self.pending_entrant_merges.append((entrant_id, surviving_id))
+
+    def driver_name(self, driver_id: int) -> str:
+        return self.names.value_of(self._driver_name[self.canonical_driver(driver_id)])
+
+    def resolve_entrant(self, driver_id: int, model_name: str, team_name: str) -> int:
+        key = (self.canonical_driver(driver_id), self.models.intern(model_name), self.teams.intern(team_name))
+        entrant_id = self._entrant_ids.get(key)
+        if entrant_id is None:
+            entrant_id = len(self._entrant_keys)
+            self._entrant_ids[key] = entrant_id
+            self._entrant_keys.append(key)
+        return entrant_id
+
+    def entrant_key(self, entrant_id: int) -> tuple[int, int, int]:
+        """Returns the (driver id, model id, team id) an entrant id was allocated for."""
+        return self._entrant_keys[entrant_id]
@@ -1,62 +1,44 @@
 import os
-import json
 import sys
-import pandas as pd
 from functools import reduce
 
 from generated_data import DriverStandings, DriverStandingsRow, TeamStandingsRow, TeamStandings, RaceResultRow, \
     RaceResults, ModelStandingsRow
+from identity_registry import IdentityRegistry
 from metadata import SeasonInfo, RaceEvent
+from season_paths import DRIVER_STANDINGS_FILENAME, TEAM_STANDINGS_FILENAME, HEAD_TO_HEAD_FILENAME, \
+    load_season_list, season_dir, season_info_path, race_result_path
 from server_result_data import ServerSessionData, SessionCarData, SessionLapData, SessionResultData
 
-SEASONS_PATH = './data/seasons'
-SEASONS_LIST_PATH = os.path.join(SEASONS_PATH, 'info.json')
-PARSE_HISTORY_FILE = './data/parse-history.json'
-
-SEASON_INFO_FILE = 'season-info.json'
-SEASON_DRIVERS_FILENAME = 'drivers.json'
-SEASON_TEAMS_FILENAME = 'teams.json'
-
 
 class Team(object):
     @staticmethod
-    def from_session_car_data(car_data: SessionCarData):
-        return Team(car_data.model, car_data.driver.team)
-
-    @staticmethod
-    def get_unique_id_for(model_name, team_name):
-        return model_name + '-' + team_name
+    def from_session_car_data(car_data: SessionCarData, model_id: int, team_id: int):
+        return Team(car_data.model, car_data.driver.team, model_id, team_id)
 
-    def __init__(self, model_name, team_name):
+    def __init__(self, model_name, team_name, model_id=None, team_id=None):
         self.model_name = model_name
         self.team_name = team_name
-
-    def unique_id(self):
-        return Team.get_unique_id_for(self.model_name, self.team_name)
+        self.model_id: int | None = model_id
+        self.team_id: int | None = team_id
 
 
 class Driver(object):
     @staticmethod
-    def from_session_car_data(car_data: SessionCarData):
+    def from_session_car_data(car_data: SessionCarData, driver_id: int):
         driver = Driver()
+        driver.driver_id = driver_id
         driver.guid = car_data.driver.guid
         driver.name = car_data.driver.name
         driver.nation = car_data.driver.nation
         return driver
 
-    @staticmethod
-    def get_unique_id(guid, name):
-        return guid + '-' + name
-
     def __init__(self):
+        self.driver_id: int | None = None
         self.guid = None
         self.name = None
         self.nation = None
 
-    @property
-    def unique_id(self):
-        return Driver.get_unique_id(self.guid, self.name)
-
 
 class Classification:
     DNF = -1
@@ -84,35 +66,32 @@ class Classification:
 
 class SeasonEntrant(object):
     @staticmethod
-    def from_session_car_data(car_data: SessionCarData):
-        return SeasonEntrant(driver=Driver.from_session_car_data(car_data),
-                             team=Team.from_session_car_data(car_data))
-
-    @staticmethod
-    def unique_id_from_car_data(car_data: SessionCarData):
-        return SeasonEntrant.unique_id_for(car_data.driver.guid,
-                                           car_data.driver.name,
-                                           car_data.model,
-                                           car_data.driver.team)
+    def from_session_car_data(entrant_id: int, car_data: SessionCarData, identities: IdentityRegistry):
+        driver_id, model_id, team_id = identities.entrant_key(entrant_id)
+        return SeasonEntrant(entrant_id,
+                             driver=Driver.from_session_car_data(car_data, driver_id),
+                             team=Team.from_session_car_data(car_data, model_id, team_id))
 
     @staticmethod
-    def unique_id_for(driver_guid, driver_name, car_model_name, team_name):
-        return (Driver.get_unique_id(driver_guid, driver_name) + "-" +
-                Team.get_unique_id_for(car_model_name, team_name))
-
-    def __init__(self, driver, team):
+    def entrant_id_from_car_data(car_data: SessionCarData, identities: IdentityRegistry):
+        driver_id = identities.resolve_driver(car_data.driver.guid,
+                                              car_data.driver.guids_list,
+                                              car_data.driver.name)
+        return identities.resolve_entrant(driver_id, car_data.model, car_data.driver.team)
+
+    def __init__(self, entrant_id, driver, team):
+        self.entrant_id: int = entrant_id
         self.driver: Driver = driver
         self.team: Team = team
         self.qualify_positions = list()
         self.finish_positions = list()
         self.dropped_round_indexes = set()
 
-    @property
-    def unique_id(self):
-        return SeasonEntrant.unique_id_for(self.driver.guid,
-                                           self.driver.name,
-                                           self.team.model_name,
-                                           self.team.team_name)
+    def entered_round(self, race_idx):
+        return self.finish_positions[race_idx] != Classification.DNE
+
+    def started_round(self, race_idx):
+        return self.entered_round(race_idx) and self.finish_positions[race_idx] != Classification.DNS
 
     def add_qualifying_result(self, race_idx, position):
         self.qualify_positions.insert(race_idx, position)
@@ -154,6 +133,9 @@ class RaceResult(object):
         self.fastest_lap_car_idx = None
         self.fastest_lap_time = sys.maxsize
         self.best_lap_by_car: dict[int, int] = dict()
+        self.position_by_car: dict[int, int] = dict()
+        self.laps_by_car: dict[int, int] = dict()
+        self.dns_classifications: dict[int, RaceResultRow] = dict()
 
     def add_entrant(self, car_id, season_entrant):
         self.entrants[car_id] = season_entrant
@@ -165,12 +147,14 @@ class RaceResult(object):
 class Season(object):
     def __init__(self, info: SeasonInfo):
         self.info: SeasonInfo = info
-        self.entrants: dict[str, SeasonEntrant] = dict()
+        self.identities = IdentityRegistry()
+        # Keyed by entrant id; ids are allocated by the identity registry as entrants are first seen
+        self.entrants: dict[int, SeasonEntrant] = dict()
         self.race_results: list[RaceResult] = list()
 
     def add_race_result(self, name, session_data: ServerSessionData):
         race_idx = len(self.race_results)
-        dns_entrants_ids = set(self.entrants.keys())
+        dns_entrant_ids = set(self.entrants.keys())
         race_result = RaceResult()
         race_result.name = name
         race_result.track = f"{session_data.track_name}-{session_data.track_config}"
@@ -180,25 +164,38 @@ class Season(object):
         for car_data in session_data.cars:
             if car_data.driver.name in ignored_driver_names:
                 continue
-            entrant_id = SeasonEntrant.unique_id_from_car_data(car_data)
-            if self.get_entrant(entrant_id) is None:
-                self.add_entrant(car_data, entered_at=race_idx)
-            race_result.add_entrant(car_data.car_id, self.get_entrant(entrant_id))
-            dns_entrants_ids.add(entrant_id)
+            entrant_id = SeasonEntrant.entrant_id_from_car_data(car_data, self.identities)
+            for merged_id, surviving_id in self.identities.pending_entrant_merges:
+                merged = self.merge_entrants(merged_id, surviving_id)
+                dns_entrant_ids.discard(merged_id)
+                for car_id, race_entrant in race_result.entrants.items():
+                    if race_entrant is merged:
+                        race_result.entrants[car_id] = self.entrants[surviving_id]
+            self.identities.pending_entrant_merges.clear()
+            entrant = self.get_entrant(entrant_id)
+            if entrant is None:
+                entrant = self.add_entrant(entrant_id, car_data, entered_at=race_idx)
+            else:
+                entrant.driver.name = car_data.driver.name  # use most recent driver name
+            race_result.add_entrant(car_data.car_id, entrant)
+            dns_entrant_ids.add(entrant_id)
 
         race_result.winning_time = session_data.result[0].total_time
         race_result.winning_laps_completed = session_data.result[0].num_laps
         for pos_idx, result in enumerate(session_data.result):
             if result.car_id not in race_result.entrants:
                 continue
+            entrant = race_result.entrants[result.car_id]
+            if len(entrant.finish_positions) > race_idx:
+                continue  # the same entrant in a second car would shift its per-round lists
             race_result.best_lap_by_car[result.car_id] = result.best_lap
+            race_result.position_by_car[result.car_id] = pos_idx+1
+            race_result.laps_by_car[result.car_id] = result.num_laps
             if result.best_lap < race_result.fastest_lap_time:
                 race_result.fastest_lap_car_idx = result.car_id
                 race_result.fastest_lap_time = result.best_lap
 
-            entrant = race_result.entrants[result.car_id]
-            if entrant.unique_id in dns_entrants_ids:
-                dns_entrants_ids.remove(entrant.unique_id)
+            dns_entrant_ids.discard(entrant.entrant_id)
             entrant.add_qualifying_result(race_idx, result.grid_position)
             if result.grid_position == 1:
                 race_result.pole_car_idx = result.car_id
@@ -223,10 +220,14 @@ class Season(object):
             )
             race_result.classifications.append(race_entry)
 
-        for entrant_id in dns_entrants_ids:
+        raced_driver_ids = {self.identities.canonical_driver(race_result.entrants[car_id].driver.driver_id)
+                            for car_id in race_result.position_by_car}
+        for entrant_id in dns_entrant_ids:
             entrant = self.entrants[entrant_id]
             entrant.finish_positions.insert(race_idx, Classification.DNS)
             entrant.add_qualifying_result(race_idx, Classification.DNQ)
+            if self.identities.canonical_driver(entrant.driver.driver_id) in raced_driver_ids:
+                continue  # the driver has a result for another entry this round
             race_entry = RaceResultRow(
                 classification=entrant.finish_positions[race_idx],
                 driver_name=entrant.driver.name,
@@ -238,26 +239,58 @@ class Season(object):
                 penalty_time=0
             )
             race_result.classifications.append(race_entry)
+            race_result.dns_classifications[entrant_id] = race_entry
 
         self.race_results.append(race_result)
 
-    def get_entrant(self, driver_id):
-        return self.entrants.get(driver_id, None)
-
-    def add_entrant(self, car_data: SessionCarData, entered_at: int = 0):
-        e = SeasonEntrant.from_session_car_data(car_data)
+    def merge_entrants(self, merged_id, surviving_id):
+        """
+        Folds the per-round results of an entrant into another one for the same driver, car and team, keeping
+        whichever entry took part in each round and dropping the other's DNS row. The surviving entry's result is
+        kept when both started. Returns the merged entrant.
+        """
+        merged = self.entrants.pop(merged_id)
+        surviving = self.entrants[surviving_id]
+        for race_idx, race in enumerate(self.race_results):
+            if merged.started_round(race_idx) and not surviving.started_round(race_idx):
+                use_merged = True
+            else:
+                use_merged = merged.entered_round(race_idx) and not surviving.entered_round(race_idx)
+            if use_merged:
+                surviving.finish_positions[race_idx] = merged.finish_positions[race_idx]
+                surviving.qualify_positions[race_idx] = merged.qualify_positions[race_idx]
+                dropped_row = race.dns_classifications.pop(surviving_id, None)
+                kept_row = race.dns_classifications.pop(merged_id, None)
+                if kept_row is not None:
+                    race.dns_classifications[surviving_id] = kept_row
+            else:
+                dropped_row = race.dns_classifications.pop(merged_id, None)
+            if dropped_row is not None:
+                race.classifications = [row for row in race.classifications if row is not dropped_row]
+            for car_id, entrant in race.entrants.items():
+                if entrant is merged:
+                    race.entrants[car_id] = surviving
+        return merged
+
+    def get_entrant(self, entrant_id):
+        return self.entrants.get(entrant_id, None)
+
+    def add_entrant(self, entrant_id: int, car_data: SessionCarData, entered_at: int = 0):
+        e = SeasonEntrant.from_session_car_data(entrant_id, car_data, self.identities)
         e.qualify_positions = [Classification.DNE] * entered_at
         e.finish_positions = [Classification.DNE] * entered_at
-        self.entrants[e.unique_id] = e
+        self.entrants[entrant_id] = e
+        return e
 
     def generate_standings(self, output_path):
-        driver_rows: dict[str, DriverStandingsRow] = dict()
-        team_rows: dict[str, TeamStandingsRow] = dict()
-        model_rows: dict[str, ModelStandingsRow] = dict()
-        driver_finishing_position_lookup: dict[str, list[int]] = dict()
+        # All lookups are keyed by the integer ids interned in self.identities
+        driver_rows: dict[int, DriverStandingsRow] = dict()
+        team_rows: dict[int, TeamStandingsRow] = dict()
+        model_rows: dict[int, ModelStandingsRow] = dict()
+        driver_finishing_position_lookup: dict[int, list[int]] = dict()
         # TODO need somthing more fleshed out to handle multiple team scores
-        team_finishing_position_lookup: dict[str, list[int]] = dict()
-        model_finishing_position_lookup: dict[str, list[int]] = dict()
+        team_finishing_position_lookup: dict[int, list[int]] = dict()
+        model_finishing_position_lookup: dict[int, list[int]] = dict()
 
         def count_championship_points(finish_positions):
             return sum(map(lambda pos: self.info.points_system[pos-1] if pos-1 < len(self.info.points_system) else 0,
@@ -276,25 +309,25 @@ class Season(object):
                 collection[key] = [select_best_finish_pos(collection[key][idx], pos)
                                    for (idx, pos) in enumerate(finish_positions)]
 
-        for uid, entrant in self.entrants.items():
+        for entrant in self.entrants.values():
             wins = entrant.finish_positions.count(1)
             podiums = reduce(lambda total,pos: total+(pos<=3) if pos>0 else total, entrant.finish_positions, 0)
             poles = entrant.qualify_positions.count(1)
             total_points=count_championship_points(entrant.finish_positions)
 
             # TODO do we want to handle teams using different cars?
-            team_name = entrant.team.team_name
-            if team_name not in team_finishing_position_lookup:
-                team_finishing_position_lookup[team_name] = entrant.finish_positions
+            team_id = entrant.team.team_id
+            if team_id not in team_finishing_position_lookup:
+                team_finishing_position_lookup[team_id] = entrant.finish_positions
             else:
-                team_finishing_position_lookup[team_name] = [select_best_finish_pos(team_finishing_position_lookup[team_name][idx], pos)
-                                                             for (idx, pos) in enumerate(entrant.finish_positions)]
+                team_finishing_position_lookup[team_id] = [select_best_finish_pos(team_finishing_position_lookup[team_id][idx], pos)
+                                                           for (idx, pos) in enumerate(entrant.finish_positions)]
 
-            update_best_finish_pos(model_finishing_position_lookup, entrant.team.model_name, entrant.finish_positions)
+            update_best_finish_pos(model_finishing_position_lookup, entrant.team.model_id, entrant.finish_positions)
 
-            if team_name not in team_rows:
-                team_rows[team_name] = TeamStandingsRow(
-                    name=team_name,
+            if team_id not in team_rows:
+                team_rows[team_id] = TeamStandingsRow(
+                    name=entrant.team.team_name,
                     car=entrant.team.model_name,
                     championship_points=0,
                     wins=wins,
@@ -304,14 +337,14 @@ class Season(object):
                     best_finish=entrant.get_highest_finish_position()
                 )
             else:
-                team_rows[team_name].wins += wins
-                team_rows[team_name].podiums += podiums
-                team_rows[team_name].poles += poles
-                team_rows[team_name].total_points += total_points
-                current_best_finish = team_rows[team_name].best_finish
+                team_rows[team_id].wins += wins
+                team_rows[team_id].podiums += podiums
+                team_rows[team_id].poles += poles
+                team_rows[team_id].total_points += total_points
+                current_best_finish = team_rows[team_id].best_finish
                 entrant_best_finish = entrant.get_highest_finish_position()
                 if entrant_best_finish is not None:
-                    team_rows[team_name].best_finish = entrant_best_finish if current_best_finish is None else min(current_best_finish, entrant_best_finish)
+                    team_rows[team_id].best_finish = entrant_best_finish if current_best_finish is None else min(current_best_finish, entrant_best_finish)
 
             if self.info.drop_rounds:
                 champ_points = count_championship_points(entrant.get_finish_positions_with_drop_rounds(self.info.drop_rounds))
@@ -321,11 +354,12 @@ class Season(object):
             champ_points += poles*self.info.pole_points
             total_points += poles*self.info.pole_points
 
-            driver_name = entrant.driver.name
-            if driver_name not in driver_rows:
-                driver_finishing_position_lookup[driver_name] = entrant.finish_positions
-                driver_rows[driver_name] = DriverStandingsRow(
-                    name=driver_name,
+            # Merge on the resolved driver identity so renamed drivers keep a single row
+            driver_id = self.identities.canonical_driver(entrant.driver.driver_id)
+            if driver_id not in driver_rows:
+                driver_finishing_position_lookup[driver_id] = entrant.finish_positions
+                driver_rows[driver_id] = DriverStandingsRow(
+                    name=self.identities.driver_name(driver_id),
                     team=entrant.team.team_name,
                     nation_code=entrant.driver.nation,
                     championship_points=champ_points,
@@ -337,24 +371,29 @@ class Season(object):
                 )
             else:
                 # Account for drivers having multiple entries racing for different teams
-                driver_rows[driver_name].team = entrant.team.team_name  # use most recent team name
-                driver_rows[driver_name].wins += wins
-                driver_rows[driver_name].podiums += podiums
-                driver_rows[driver_name].poles += poles
-                driver_rows[driver_name].championship_points += champ_points
-                driver_rows[driver_name].total_points += total_points
+                driver_rows[driver_id].team = entrant.team.team_name  # use most recent team name
+                driver_rows[driver_id].wins += wins
+                driver_rows[driver_id].podiums += podiums
+                driver_rows[driver_id].poles += poles
+                driver_rows[driver_id].championship_points += champ_points
+                driver_rows[driver_id].total_points += total_points
                 best_finish = entrant.get_highest_finish_position()
-                current_best_finish = driver_rows[driver_name].best_finish
+                current_best_finish = driver_rows[driver_id].best_finish
                 if best_finish is not None:
-                    driver_rows[driver_name].best_finish = best_finish if current_best_finish is None else min(current_best_finish, best_finish)
+                    driver_rows[driver_id].best_finish = best_finish if current_best_finish is None else min(current_best_finish, best_finish)
                 # merge finish positions
-                driver_finishing_position_lookup[driver_name] = [max(driver_finishing_position_lookup[driver_name][idx], pos) for (idx, pos) in enumerate(entrant.finish_positions)]
+                driver_finishing_position_lookup[driver_id] = [max(driver_finishing_position_lookup[driver_id][idx], pos) for (idx, pos) in enumerate(entrant.finish_positions)]
+
+        for team_id, best_finishing_pos_list in team_finishing_position_lookup.items():
+            team_rows[team_id].championship_points = count_championship_points(best_finishing_pos_list)
 
-        for team_name, best_finishing_pos_list in team_finishing_position_lookup.items():
-            team_rows[team_name].championship_points = count_championship_points(best_finishing_pos_list)
+        write_json_file(calculate_drivers_standings(driver_rows, driver_finishing_position_lookup), os.path.join(output_path, DRIVER_STANDINGS_FILENAME))
+        write_json_file(calculate_team_standings(team_rows, team_finishing_position_lookup, len(self.entrants)), os.path.join(output_path, TEAM_STANDINGS_FILENAME))
 
-        write_json_file(calculate_drivers_standings(driver_rows, driver_finishing_position_lookup), os.path.join(output_path, "driver_standings.json"))
-        write_json_file(calculate_team_standings(team_rows, team_finishing_position_lookup, len(self.entrants)), os.path.join(output_path, "team_standings.json"))
+    def generate_head_to_head(self, output_path):
+        # numpy is only needed for the head-to-head matrices
+        from head_to_head import calculate_head_to_head
+        write_json_file(calculate_head_to_head(self), os.path.join(output_path, HEAD_TO_HEAD_FILENAME))
 
     def generate_race_results(self, output_path):
         for idx, race in enumerate(self.race_results, 1):
@@ -386,28 +425,31 @@ def write_json_file(json_data_obj, path):
 
     json_data_obj.to_json_file(path, ensure_ascii=False)
 
-def calculate_drivers_standings(rows: dict[str, DriverStandingsRow],
-                                finish_positions: dict[str, list[int]]) -> DriverStandings:
+def calculate_drivers_standings(rows: dict[int, DriverStandingsRow],
+                                finish_positions: dict[int, list[int]]) -> DriverStandings:
 
     dataframe = _create_standings_sorted_dataframe(rows, finish_positions, len(rows))
-    return DriverStandings([rows[name] for name in dataframe["name"]])
+    return DriverStandings([rows[key] for key in dataframe.index])
 
 
-def calculate_team_standings(rows: dict[str, TeamStandingsRow],
-                             finish_positions: dict[str, list[int]],
+def calculate_team_standings(rows: dict[int, TeamStandingsRow],
+                             finish_positions: dict[int, list[int]],
                              max_finish_pos: int) -> TeamStandings:
     dataframe = _create_standings_sorted_dataframe(rows, finish_positions, max_finish_pos)
-    return TeamStandings([rows[name] for name in dataframe["name"]])
+    return TeamStandings([rows[key] for key in dataframe.index])
 
 
-def _create_standings_sorted_dataframe(rows, finish_positions: dict[str, list[int]], max_finish_pos: int):
+def _create_standings_sorted_dataframe(rows, finish_positions: dict[int, list[int]], max_finish_pos: int):
+    # pandas is only needed to sort standings, so keep it off the import path of everything else
+    import pandas as pd
+
     def create_pos_column_name(pos: int):
         return f"position_{pos}_count"
-    dataframe = pd.DataFrame(rows.values())
+    dataframe = pd.DataFrame(rows.values(), index=list(rows.keys()))
     for position in range(1, max_finish_pos + 1):
         column_name = create_pos_column_name(position)
-        dataframe[column_name] = dataframe['name'].apply(
-            lambda name: finish_positions.get(name, []).count(position)
+        dataframe[column_name] = dataframe.index.map(
+            lambda key: finish_positions.get(key, []).count(position)
         )
     dataframe.sort_values(['championship_points'] +
                           [create_pos_column_name(pos) for pos in range(1, max_finish_pos + 1)],
@@ -415,31 +457,24 @@ def _create_standings_sorted_dataframe(rows, finish_positions: dict[str, list[in
     return dataframe
 
 
-def main():
-    if not os.path.isfile(SEASONS_LIST_PATH):
-        exit(0)
-
-    try:
-        with open(SEASONS_LIST_PATH, 'r') as f:
-            season_list = json.load(f)
-    except FileNotFoundError:
-        exit(0)
-
-    for season in season_list:
-        season_info_path = os.path.join(SEASONS_PATH, season, SEASON_INFO_FILE)
-        season_info = SeasonInfo.from_json_file(season_info_path)
-        s = Season(season_info)
-        race_dir_path = os.path.join(os.path.dirname(season_info_path), "races")
-        for race in season_info.races:
-            if not race.result_file:
-                continue
-            result_path = os.path.join(race_dir_path, race.result_file+".json")
-            if not os.path.isfile(result_path):
-                continue
-            s.add_race_result(race.name, ServerSessionData.from_json_file(result_path))
+def load_season(season: str) -> Season:
+    s = Season(SeasonInfo.from_json_file(season_info_path(season)))
+    for race in s.info.races:
+        if not race.result_file:
+            continue
+        result_path = race_result_path(season, race.result_file)
+        if not os.path.isfile(result_path):
+            continue
+        s.add_race_result(race.name, ServerSessionData.from_json_file(result_path))
+    return s
+
 
-        s.generate_standings(os.path.dirname(season_info_path))
-        s.generate_race_results(os.path.dirname(season_info_path))
+def main():
+    for season in load_season_list():
+        s = load_season(season)
+        s.generate_standings(season_dir(season))
+        s.generate_race_results(season_dir(season))
+        s.generate_head_to_head(season_dir(season))
 
 
 if __name__ == "__main__":
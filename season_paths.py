@@ -0,0 +1,34 @@
+import os
+import json
+
+SEASONS_PATH = './data/seasons'
+SEASONS_LIST_PATH = os.path.join(SEASONS_PATH, 'info.json')
+PARSE_HISTORY_FILE = './data/parse-history.json'
+
+SEASON_INFO_FILE = 'season-info.json'
+SEASON_DRIVERS_FILENAME = 'drivers.json'
+SEASON_TEAMS_FILENAME = 'teams.json'
+SEASON_RACES_DIR = 'races'
+DRIVER_STANDINGS_FILENAME = 'driver_standings.json'
+TEAM_STANDINGS_FILENAME = 'team_standings.json'
+HEAD_TO_HEAD_FILENAME = 'head_to_head.json'
+
+
+def load_season_list() -> list[str]:
+    try:
+        with open(SEASONS_LIST_PATH, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+
+
+def season_dir(season: str) -> str:
+    return os.path.join(SEASONS_PATH, season)
+
+
+def season_info_path(season: str) -> str:
+    return os.path.join(season_dir(season), SEASON_INFO_FILE)
+
+
+def race_result_path(season: str, result_file: str) -> str:
+    return os.path.join(season_dir(season), SEASON_RACES_DIR, result_file + ".json")
@@ -5,6 +5,9 @@ from dataclass_wizard import JSONPyWizard
 from dataclass_wizard.v1 import Alias
 from dataclass_wizard.serial_json import JSONWizard
 
+# Reported as the best lap of a car that did not set a valid lap
+NO_VALID_LAP_TIME = 999999999
+
 
 @dataclass
 class SessionDriverData(JSONPyWizard, JSONFileWizard, key_case='AUTO'):
@@ -16,6 +19,7 @@ class SessionDriverData(JSONPyWizard, JSONFileWizard, key_case='AUTO'):
     nation: str
     team: str
     class_id: str = Alias('ClassID')
+    guids_list: list[str] = field(default_factory=list)
 
 
 @dataclass
@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from metadata import SeasonInfo
+from parse_results import Season
+from server_result_data import ServerSessionData, SessionConfig, SessionCarData, SessionDriverData, \
+    SessionResultData
+
+
+def make_car(car_id, name, guid, guids_list=None, team="Team", model="car"):
+    driver = SessionDriverData(guid=guid, name=name, nation="GBR", team=team, class_id="",
+                               guids_list=[guid] if guids_list is None else guids_list)
+    return SessionCarData(car_id=car_id, model=model, driver=driver, restrictor=0, ballast_kg=0)
+
+
+def make_session(cars, finishing_order, grid=None, num_laps=None, best_laps=None):
+    """
+    Builds a race session where the cars in finishing_order finish in that order. Grid positions, laps completed
+    and best laps default to the finishing position, 10 laps and 90000 + finishing position; override them per
+    car id with the grid, num_laps and best_laps dicts.
+    """
+    grid, num_laps, best_laps = grid or {}, num_laps or {}, best_laps or {}
+    results = [SessionResultData(car_id=car_id, total_time=1000 * pos, num_laps=num_laps.get(car_id, 10),
+                                 has_penalty=False, penalty_time=0, lap_penalty=0, disqualified=False,
+                                 grid_position=grid.get(car_id, pos), best_lap=best_laps.get(car_id, 90000 + pos))
+               for pos, car_id in enumerate(finishing_order, 1)]
+    return ServerSessionData(version=7, event_name="Test", date=datetime(2025, 1, 1), track_name="track",
+                             track_config="full", session_config=SessionConfig(session_type=3, time=0, laps=10),
+                             cars=cars, result=results)
+
+
+def make_season(*sessions):
+    season = Season(SeasonInfo(index=0, name="Test"))
+    for idx, session in enumerate(sessions, 1):
+        season.add_race_result(f"Round {idx}", session)
+    return season
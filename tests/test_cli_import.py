@@ -0,0 +1,41 @@
+import os
+import sys
+import subprocess
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+HEAVY_MODULES = ('pandas', 'numpy', 'dataclass_wizard', 'discord_webhook', 'tabulate')
+# Measured at roughly 20ms; the budget leaves headroom for slow CI machines
+CTC_IMPORT_BUDGET_US = 150_000
+
+
+def _import_times(*args):
+    """Runs python -X importtime from the repository root and returns {module: cumulative microseconds}."""
+    completed = subprocess.run([sys.executable, '-X', 'importtime', *args],
+                               cwd=REPO_ROOT, capture_output=True, text=True, check=True)
+    times = dict()
+    for line in completed.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def _heavy_modules_in(times):
+    return sorted(name for name in times if name.split('.')[0] in HEAVY_MODULES)
+
+
+def test_ctc_import_skips_heavy_dependencies():
+    times = _import_times('-c', 'import ctc')
+    assert _heavy_modules_in(times) == []
+
+
+def test_ctc_import_time_within_budget():
+    times = _import_times('-c', 'import ctc')
+    assert times['ctc'] < CTC_IMPORT_BUDGET_US
+
+
+def test_stats_command_skips_heavy_dependencies():
+    times = _import_times('ctc.py', 'stats')
+    assert _heavy_modules_in(times) == []
@@ -0,0 +1,77 @@
+import pytest
+
+from head_to_head import calculate_head_to_head
+from season_builders import make_car, make_season, make_session
+from server_result_data import NO_VALID_LAP_TIME
+
+ALICE, BOB, CHRIS = range(3)
+
+
+def _cars(*car_ids):
+    cars = {0: make_car(0, "Alice", "a", team="T1"),
+            1: make_car(1, "Bob", "b", team="T1"),
+            2: make_car(2, "Chris", "c", team="T2"),
+            3: make_car(3, "Dana", "d", team="T2")}
+    return [cars[car_id] for car_id in car_ids]
+
+
+@pytest.fixture(scope="module")
+def head_to_head():
+    season = make_season(
+        # Dana is entered but never starts
+        make_session(_cars(0, 1, 2, 3), [0, 1, 2], grid={0: 2, 1: 1, 2: 3},
+                     best_laps={0: 90000, 1: 90500, 2: 91000}),
+        # Chris misses a round entirely
+        make_session(_cars(0, 1), [1, 0], grid={0: 1, 1: 2}, best_laps={0: 89000, 1: 89500}),
+        # Alice retires on lap 1
+        make_session(_cars(0, 1, 2), [1, 2, 0], grid={0: 1, 1: 2, 2: 3}, num_laps={0: 0},
+                     best_laps={0: 95000, 1: 91000, 2: 91500}),
+        # Chris has no valid lap
+        make_session(_cars(0, 1, 2), [0, 1, 2], best_laps={0: 88000, 1: 88400, 2: NO_VALID_LAP_TIME}),
+    )
+    return calculate_head_to_head(season)
+
+
+def test_drivers_who_never_started_are_dropped(head_to_head):
+    assert head_to_head.drivers == ["Alice", "Bob", "Chris"]
+    assert head_to_head.teams == ["T1", "T1", "T2"]
+
+
+def test_round_counts(head_to_head):
+    assert head_to_head.shared_rounds == [[0, 4, 3], [4, 0, 3], [3, 3, 0]]
+    assert head_to_head.teammate_rounds == [[0, 4, 0], [4, 0, 0], [0, 0, 0]]
+
+
+def test_wins_skip_rounds_a_driver_missed(head_to_head):
+    assert head_to_head.race_wins == [[0, 2, 2], [2, 0, 3], [1, 0, 0]]
+    assert head_to_head.qualifying_wins == [[0, 3, 3], [1, 0, 3], [0, 0, 0]]
+
+
+def test_averages_are_row_minus_column(head_to_head):
+    assert head_to_head.average_finish_gap[ALICE][BOB] == -0.33
+    assert head_to_head.average_finish_gap[ALICE][CHRIS] == -2.0
+    assert head_to_head.average_finish_gap[BOB][CHRIS] == -1.0
+    assert head_to_head.average_best_lap_delta[ALICE][BOB] == -467
+
+
+def test_invalid_best_laps_are_excluded(head_to_head):
+    # Only round 1 counts for Alice against Chris: Alice has no laps in round 3 and Chris no valid lap in round 4
+    assert head_to_head.average_best_lap_delta[ALICE][CHRIS] == -1000
+    assert head_to_head.average_best_lap_delta[BOB][CHRIS] == -500
+
+
+def test_average_matrices_are_antisymmetric(head_to_head):
+    for matrix in (head_to_head.average_finish_gap, head_to_head.average_best_lap_delta):
+        for i, row in enumerate(matrix):
+            for j, value in enumerate(row):
+                if i != j:
+                    assert value == -matrix[j][i]
+
+
+def test_diagonals(head_to_head):
+    for i in range(len(head_to_head.drivers)):
+        for matrix in (head_to_head.shared_rounds, head_to_head.teammate_rounds,
+                       head_to_head.qualifying_wins, head_to_head.race_wins):
+            assert matrix[i][i] == 0
+        assert head_to_head.average_finish_gap[i][i] is None
+        assert head_to_head.average_best_lap_delta[i][i] is None
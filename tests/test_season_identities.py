@@ -0,0 +1,69 @@
+from season_builders import make_car, make_season, make_session
+
+
+def _entrant_for(season, name):
+    matches = [entrant for entrant in season.entrants.values()
+               if season.identities.driver_name(entrant.driver.driver_id) == name]
+    assert len(matches) == 1
+    return matches[0]
+
+
+def _classified_names(race):
+    return sorted(row.driver_name for row in race.classifications)
+
+
+def test_rename_under_same_guid_keeps_one_entrant():
+    season = make_season(
+        make_session([make_car(0, "Alice", "a"), make_car(1, "Bob", "b")], [0, 1]),
+        make_session([make_car(0, "Alicia", "a"), make_car(1, "Bob", "b")], [1, 0]),
+    )
+
+    assert len(season.entrants) == 2
+    alicia = _entrant_for(season, "Alicia")
+    assert alicia.finish_positions == [1, 2]
+    assert alicia.qualify_positions == [1, 2]
+    assert _classified_names(season.race_results[1]) == ["Alicia", "Bob"]
+
+
+def test_guids_joined_by_later_guids_list_merge_entrants():
+    season = make_season(
+        make_session([make_car(0, "Alice", "a"), make_car(1, "Bob", "b")], [0, 1]),
+        # Alice reports a new GUID and is seen as a separate driver
+        make_session([make_car(0, "Alice", "a2"), make_car(1, "Bob", "b")], [1, 0]),
+        # then a GuidsList links both of her GUIDs
+        make_session([make_car(0, "Alice", "a2", guids_list=["a", "a2"]), make_car(1, "Bob", "b")], [0, 1]),
+        make_session([make_car(0, "Alice", "a2", guids_list=["a", "a2"]), make_car(1, "Bob", "b")], [1, 0]),
+    )
+
+    assert len(season.entrants) == 2
+    alice = _entrant_for(season, "Alice")
+    # The earliest seen entry survives the merge
+    assert alice.entrant_id == 0
+    assert alice.finish_positions == [1, 2, 1, 2]
+    assert alice.qualify_positions == [1, 2, 1, 2]
+    for race in season.race_results:
+        assert _classified_names(race) == ["Alice", "Bob"]
+        assert all(row.classification > 0 for row in race.classifications)
+
+
+def test_guidless_cars_are_keyed_by_name():
+    season = make_season(
+        make_session([make_car(0, "Xavier", ""), make_car(1, "Yuri", "")], [0, 1]),
+        make_session([make_car(3, "Xavier", ""), make_car(4, "Yuri", "")], [4, 3]),
+    )
+
+    assert len(season.entrants) == 2
+    assert _entrant_for(season, "Xavier").finish_positions == [1, 2]
+    assert _entrant_for(season, "Yuri").finish_positions == [2, 1]
+
+
+def test_second_car_for_same_entrant_does_not_shift_rounds():
+    season = make_season(
+        make_session([make_car(0, "Alice", "a"), make_car(1, "Alice", "a"), make_car(2, "Bob", "b")], [0, 2, 1]),
+        make_session([make_car(0, "Alice", "a"), make_car(2, "Bob", "b")], [2, 0]),
+    )
+
+    alice = _entrant_for(season, "Alice")
+    assert alice.finish_positions == [1, 2]
+    assert alice.qualify_positions == [1, 2]
+    assert _entrant_for(season, "Bob").finish_positions == [2, 1]